@@ -1,30 +1,89 @@
 #!/usr/bin/env python3
 import os
 import sys
+import codecs
+import concurrent.futures
+import functools
+import hashlib
+import io
+import json
 import platform
+import re
 import shutil
 import subprocess
-import tempfile
+import threading
+import urllib.parse
 import urllib.request
 import zipfile
 from pathlib import Path
 
+try:
+    import urllib3
+except ImportError:
+    urllib3 = None
+
 # -----------------------
 # Utility helpers
 # -----------------------
 
-def is_windows():
-    return platform.system().lower().startswith("win")
+IS_WINDOWS = platform.system().lower().startswith("win")
+FLUTTER_BIN_NAME = "flutter.bat" if IS_WINDOWS else "flutter"
+SDKMANAGER_NAME = "sdkmanager.bat" if IS_WINDOWS else "sdkmanager"
+
+# Buffered writers shared by log/err and streamed tool output. Created on first use (stdout may
+# be None or lack .buffer under pythonw or capture). log() only buffers; output is flushed once per
+# burst of tool output, before every command or download starts, and at the end of each install step.
+_OUT = None
+_ERR = None
+_OUT_LOCK = threading.Lock()
+
+def _wrap_stream(stream):
+    if stream is None:
+        return open(os.devnull, "w")
+    buf = getattr(stream, "buffer", None)
+    if buf is None:
+        return stream
+    stream.flush()
+    return io.TextIOWrapper(buf, encoding=stream.encoding or "utf-8", errors="replace", write_through=False, line_buffering=False)
+
+def _streams():
+    # Caller holds _OUT_LOCK.
+    global _OUT, _ERR
+    if _OUT is None:
+        _OUT = _wrap_stream(sys.stdout)
+        _ERR = _wrap_stream(sys.stderr)
+    return _OUT, _ERR
+
+def _write_out(text, flush=False):
+    with _OUT_LOCK:
+        out, _ = _streams()
+        out.write(text)
+        if flush:
+            out.flush()
+
+def flush_logs():
+    with _OUT_LOCK:
+        if _OUT is None:
+            return
+        _OUT.flush()
+        _ERR.flush()
 
 def log(msg):
-    print(msg)
+    _write_out(f"{msg}\n")
 
 def err(msg):
-    print(msg, file=sys.stderr)
+    # Errors are rare; flush right away, stdout first so ordering is preserved.
+    with _OUT_LOCK:
+        out, errs = _streams()
+        out.flush()
+        errs.write(f"{msg}\n")
+        errs.flush()
 
 def run_checked(cmd, env=None, cwd=None, input_bytes=None, shell=False):
     if isinstance(cmd, str) and not shell:
         cmd = cmd.split()
+    # Pending log lines describe what is about to run; show them before a possibly long wait.
+    flush_logs()
     p = subprocess.Popen(
         cmd,
         stdin=subprocess.PIPE if input_bytes else None,
@@ -33,68 +92,189 @@ def run_checked(cmd, env=None, cwd=None, input_bytes=None, shell=False):
         env=env,
         cwd=cwd,
         shell=shell,
-        text=False,
     )
-    out, _ = p.communicate(input=input_bytes)
-    text = out.decode("utf-8", errors="ignore")
-    if p.returncode != 0:
-        err(text)
+    if input_bytes:
+        # Feed stdin from a side thread so a blocked writer can't stall the output stream below.
+        def feed():
+            try:
+                p.stdin.write(input_bytes)
+                p.stdin.close()
+            except (BrokenPipeError, OSError):
+                pass
+        threading.Thread(target=feed, daemon=True).start()
+    # Stream output as it arrives: read1 returns whatever the child has written so far, so each
+    # burst is written and flushed once, and the next read is the one that blocks while it is idle.
+    # Decoding raw chunks (no newline translation) keeps bare \r so progress bars redraw in place.
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+    while True:
+        chunk = p.stdout.read1(1 << 16)
+        if not chunk:
+            break
+        _write_out(decoder.decode(chunk), flush=True)
+    _write_out(decoder.decode(b"", final=True), flush=True)
+    p.stdout.close()
+    if p.wait() != 0:
         raise RuntimeError(f"Command failed: {cmd}")
-    else:
-        sys.stdout.write(text)
 
+@functools.lru_cache(maxsize=None)
 def have_cmd(name):
     return shutil.which(name) is not None
 
+@functools.lru_cache(maxsize=1)
+def winget_available():
+    # WINGET_DISABLE=1 opts out of all automatic winget installs.
+    return os.environ.get("WINGET_DISABLE") != "1" and have_cmd("winget")
+
+# KEY=VALUE per line; skips blanks/comments, trims whitespace and surrounding quotes.
+_ENV_RE = re.compile(r"""^[ \t]*([^#=\s][^=\n]*?)[ \t]*=[ \t]*['"]*(.*?)['"]*[ \t]*\r?$""", re.MULTILINE)
+
 def load_env_file(path=".env"):
-    m = {}
     p = Path(path)
-    if not p.exists():
-        return m
-    for line in p.read_text(encoding="utf-8").splitlines():
-        s = line.strip()
-        if not s or s.startswith("#") or "=" not in s:
-            continue
-        k, v = s.split("=", 1)
-        v = v.strip().strip("'").strip('"')
-        m[k.strip()] = v
-    return m
+    text = p.read_text(encoding="utf-8") if p.exists() else ""
+    return {m.group(1): m.group(2) for m in _ENV_RE.finditer(text)}
+
+# Socket timeout (seconds) for downloads, so a stalled connection can't pin a worker forever.
+DOWNLOAD_TIMEOUT = 60
+
+_POOLS = {}
+_POOL_LOCK = threading.Lock()
+
+def _http_pool(url: str):
+    # Shared keep-alive pools (one per proxy) so repeated downloads skip fresh TLS handshakes.
+    # Proxy settings come from the same place urlopen reads them: *_PROXY/NO_PROXY or the OS.
+    parts = urllib.parse.urlsplit(url)
+    proxy = urllib.request.getproxies().get(parts.scheme)
+    if proxy and urllib.request.proxy_bypass(parts.hostname or ""):
+        proxy = None
+    with _POOL_LOCK:
+        if proxy not in _POOLS:
+            kw = dict(num_pools=4, maxsize=4, retries=urllib3.Retry(3), timeout=DOWNLOAD_TIMEOUT)
+            if proxy:
+                p = urllib.parse.urlsplit(proxy if "://" in proxy else f"http://{proxy}")
+                headers = None
+                if p.username:
+                    auth = f"{urllib.parse.unquote(p.username)}:{urllib.parse.unquote(p.password or '')}"
+                    headers = urllib3.make_headers(proxy_basic_auth=auth)
+                # Credentials go in proxy_headers; keep the rest of the netloc verbatim (IPv6 brackets, port).
+                proxy_url = f"{p.scheme}://{p.netloc.rpartition('@')[2]}"
+                _POOLS[proxy] = urllib3.ProxyManager(proxy_url, proxy_headers=headers, **kw)
+            else:
+                _POOLS[proxy] = urllib3.PoolManager(**kw)
+        return _POOLS[proxy]
 
 def download(url: str, dest: Path):
     dest.parent.mkdir(parents=True, exist_ok=True)
     log(f"Downloading: {url}")
-    urllib.request.urlretrieve(url, dest)
+    flush_logs()
+    if urllib3 is not None:
+        resp = _http_pool(url).request("GET", url, preload_content=False)
+        try:
+            if resp.status >= 400:
+                raise RuntimeError(f"Download failed ({resp.status}): {url}")
+            with open(dest, "wb", buffering=0) as f:
+                for buf in resp.stream(1 << 20):
+                    f.write(buf)
+        finally:
+            resp.release_conn()
+        return
+    with urllib.request.urlopen(url, timeout=DOWNLOAD_TIMEOUT) as resp, open(dest, "wb", buffering=0) as f:
+        # Large reads amortize per-call overhead; size from Content-Length within [64 KiB, 1 MiB].
+        length = int(resp.headers.get("Content-Length") or 0)
+        chunk = max(64 * 1024, min(length, 1 << 20)) if length else 1 << 20
+        shutil.copyfileobj(resp, f, length=chunk)
 
 def unzip(zip_path: Path, dest: Path):
     dest.mkdir(parents=True, exist_ok=True)
-    with zipfile.ZipFile(zip_path, "r") as z:
-        z.extractall(dest)
+    # Prefer a native extractor (faster, keeps exec bits); Windows 10+ ships bsdtar, which reads zips.
+    if IS_WINDOWS:
+        native = ["tar", "-xf", str(zip_path), "-C", str(dest)] if have_cmd("tar") else None
+    else:
+        native = ["unzip", "-q", "-o", str(zip_path), "-d", str(dest)] if have_cmd("unzip") else None
+    if native:
+        try:
+            flush_logs()
+            subprocess.run(native, check=True)
+            return
+        except (subprocess.CalledProcessError, OSError) as e:
+            err(f"Native extraction failed, falling back to zipfile: {e}")
+    # Copy members in 1 MiB blocks and restore Unix permissions, which extractall drops.
+    root = dest.resolve()
+    with zipfile.ZipFile(zip_path, "r", allowZip64=True) as z:
+        for info in z.infolist():
+            target = (root / info.filename).resolve()
+            if root != target and root not in target.parents:
+                raise RuntimeError(f"Unsafe path in archive: {info.filename}")
+            if info.is_dir():
+                target.mkdir(parents=True, exist_ok=True)
+                continue
+            target.parent.mkdir(parents=True, exist_ok=True)
+            with z.open(info) as src, open(target, "wb") as dst:
+                shutil.copyfileobj(src, dst, length=1 << 20)
+            mode = (info.external_attr >> 16) & 0o777
+            if mode and not IS_WINDOWS:
+                os.chmod(target, mode)
+
+def sha256_file(path: Path):
+    # 1 MiB reads; the 8 KiB default costs far more per-call overhead than hashing.
+    h = hashlib.sha256()
+    with open(path, "rb", buffering=0) as f:
+        for buf in iter(lambda: f.read(1 << 20), b""):
+            h.update(buf)
+    return h.hexdigest()
 
 def flutter_bin(flutter_root: Path):
-    return str(flutter_root / "bin" / ("flutter.bat" if is_windows() else "flutter"))
+    return str(flutter_root / "bin" / FLUTTER_BIN_NAME)
+
+def cmdline_bin_dir(android_sdk_root: Path):
+    return android_sdk_root / "cmdline-tools" / "latest" / "bin"
 
 def sdkmanager_bin(android_sdk_root: Path):
-    base = android_sdk_root / "cmdline-tools" / "latest" / "bin"
-    return str(base / ("sdkmanager.bat" if is_windows() else "sdkmanager"))
+    return str(cmdline_bin_dir(android_sdk_root) / SDKMANAGER_NAME)
+
+@functools.lru_cache(maxsize=4)
+def _android_env_base(android_sdk: str):
+    env = os.environ.copy()
+    env["ANDROID_SDK_ROOT"] = android_sdk
+    env["ANDROID_HOME"] = android_sdk
+    cmdline_bin = cmdline_bin_dir(Path(android_sdk))
+    platform_tools = os.path.join(android_sdk, "platform-tools")
+    env["PATH"] = f"{cmdline_bin}{os.pathsep}{platform_tools}{os.pathsep}{env.get('PATH','')}"
+    return env
+
+def _make_android_env(android_sdk: str):
+    # The PATH/env computation is cached per SDK root; callers get their own copy of the dict.
+    return dict(_android_env_base(android_sdk))
 
 # -----------------------
 # Install steps
 # -----------------------
 
+JAVA_MISSING = "Java 17 not found on PATH. Install JDK 17 and re-run.\nLinux: sudo apt install openjdk-17-jdk"
+
 def ensure_prereqs():
     # Git
     if not have_cmd("git"):
         raise SystemExit("Git not found. Install Git and re-run.\nWindows: winget install -e --id Git.Git\nLinux: sudo apt install git")
-    # Java 17
+    # Java 17: fail fast unless winget can install it alongside the other steps.
+    if not have_cmd("java") and not (IS_WINDOWS and winget_available()):
+        raise SystemExit(JAVA_MISSING)
+
+# Windows Installer allows one install at a time (error 1618 otherwise), so winget
+# installs from different workers are serialized.
+_WINGET_LOCK = threading.Lock()
+
+def install_java_winget():
+    log("Java 17 not found. Installing Microsoft OpenJDK 17 via winget...")
+    try:
+        with _WINGET_LOCK:
+            run_checked(["winget","install","-e","--id","Microsoft.OpenJDK.17","--silent","--accept-package-agreements","--accept-source-agreements"])
+    except Exception:
+        pass
+    have_cmd.cache_clear()
+
+def ensure_java():
     if not have_cmd("java"):
-        if is_windows() and have_cmd("winget"):
-            log("Java 17 not found. Installing Microsoft OpenJDK 17 via winget...")
-            try:
-                run_checked(["winget","install","-e","--id","Microsoft.OpenJDK.17","--silent","--accept-package-agreements","--accept-source-agreements"])
-            except Exception:
-                pass
-        if not have_cmd("java"):
-            raise SystemExit("Java 17 not found on PATH. Install JDK 17 and re-run.\nLinux: sudo apt install openjdk-17-jdk")
+        raise SystemExit(JAVA_MISSING)
 
 def install_flutter(flutter_root: Path, env_map):
     FLUTTER_GITHUB: str = "https://github.com/flutter/flutter"
@@ -108,12 +288,14 @@ def install_flutter(flutter_root: Path, env_map):
     ref = str(env_map["FLUTTER_REF"]) if "FLUTTER_REF" in env_map else ""
     log(f"Installing Flutter into {flutter_root} ...")
     flutter_root.parent.mkdir(parents=True, exist_ok=True)
+    # Partial clone: blobs are fetched on demand instead of transferring the whole tree up front.
+    # Tags are kept (auto-followed for the fetched commit) since `flutter --version` derives from them.
     if ref:
-        run_checked(["git","clone","--depth","1",FLUTTER_GITHUB, str(flutter_root)])
-        run_checked(["git","fetch","origin", ref, "--depth","1"], cwd=str(flutter_root))
+        run_checked(["git","clone","--filter=blob:none","--depth=1","--no-checkout",FLUTTER_GITHUB, str(flutter_root)])
+        run_checked(["git","fetch","--depth=1","origin", ref], cwd=str(flutter_root))
         run_checked(["git","checkout", ref], cwd=str(flutter_root))
     else:
-        run_checked(["git","clone","--depth","1","-b", channel, FLUTTER_GITHUB, str(flutter_root)])
+        run_checked(["git","clone","--filter=blob:none","--depth=1","--single-branch","-b", channel, FLUTTER_GITHUB, str(flutter_root)])
 
 def install_android_cmdline(android_sdk: Path, env_map):
     sdk_mgr = Path(sdkmanager_bin(android_sdk))
@@ -121,47 +303,44 @@ def install_android_cmdline(android_sdk: Path, env_map):
         log("Android cmdline-tools already present.")
         return
     cmd_ver = env_map.get("ANDROID_CMDLINE_TOOLS","11076708")
-    base = "win" if is_windows() else "linux"
+    base = "win" if IS_WINDOWS else "linux"
     url = f"https://dl.google.com/android/repository/commandlinetools-{base}-{cmd_ver}_latest.zip"
+    expected_sha = env_map.get("ANDROID_CMDLINE_TOOLS_SHA256", "").lower()
     log(f"Installing Android cmdline-tools {cmd_ver} into {android_sdk} ...")
-    android_sdk.mkdir(parents=True, exist_ok=True)
-    latest = android_sdk / "cmdline-tools" / "latest"
-    latest.mkdir(parents=True, exist_ok=True)
-    with tempfile.TemporaryDirectory() as td:
-        zpath = Path(td) / "cmdline-tools.zip"
-        download(url, zpath)
-        tmp_extract = Path(td) / "extract"
-        unzip(zpath, tmp_extract)
-        src = tmp_extract / "cmdline-tools"
-        # Move contents under latest/
-        for item in src.iterdir():
-            dst = latest / item.name
-            if item.is_dir():
-                shutil.copytree(item, dst, dirs_exist_ok=True)
-            else:
-                shutil.copy2(item, dst)
+    cmdline_root = android_sdk / "cmdline-tools"
+    latest = cmdline_root / "latest"
+    # Stage next to latest/ so the final move is a same-volume rename, not a copy.
+    staging = cmdline_root / "_staging"
+    if staging.exists():
+        shutil.rmtree(staging)
+    staging.mkdir(parents=True)
+    try:
+        # With a pinned hash the archive is kept next to latest/ and reused on re-installs;
+        # otherwise it lives in staging/ and is removed with it, even on failure.
+        zname = f"commandlinetools-{base}-{cmd_ver}_latest.zip"
+        zpath = (cmdline_root if expected_sha else staging) / zname
+        if expected_sha and zpath.exists() and sha256_file(zpath) == expected_sha:
+            log(f"Using cached {zpath.name}")
+        else:
+            download(url, zpath)
+            if expected_sha and sha256_file(zpath) != expected_sha:
+                zpath.unlink()
+                raise RuntimeError(f"SHA-256 mismatch for {url}")
+        # Extract straight after the download so ZipFile reads the archive back from the page cache
+        # rather than holding ~150 MB in memory.
+        unzip(zpath, staging)
+        if latest.exists():
+            shutil.rmtree(latest)
+        os.replace(staging / "cmdline-tools", latest)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
 
 def install_android_packages(android_sdk: Path, env_map, flutter_root: Path):
-    env = os.environ.copy()
-    env["ANDROID_SDK_ROOT"] = str(android_sdk)
-    env["ANDROID_HOME"] = str(android_sdk)
-    env["PATH"] = os.pathsep.join([
-        str(android_sdk / "cmdline-tools" / "latest" / "bin"),
-        str(android_sdk / "platform-tools"),
-        env.get("PATH",""),
-    ])
-
+    env = _make_android_env(str(android_sdk))
     sdkmanager = sdkmanager_bin(android_sdk)
-    if not Path(sdkmanager).exists():
+    if not os.path.exists(sdkmanager):
         raise RuntimeError(f"sdkmanager not found at {sdkmanager}")
 
-    # Accept licenses
-    log("Accepting Android licenses...")
-    try:
-        run_checked([sdkmanager, f"--sdk_root={android_sdk}", "--licenses"], env=env, input_bytes=("y\n"*200).encode("utf-8"))
-    except Exception as e:
-        err(f"License acceptance had warnings: {e}")
-
     # Install packages
     platforms_list = []
     platforms_id   = env_map["ANDROID_PLATFORMS"].split(',')
@@ -171,27 +350,63 @@ def install_android_packages(android_sdk: Path, env_map, flutter_root: Path):
     ndk_id         = env_map["ANDROID_NDK"]
     cmake_id       = env_map["ANDROID_CMAKE"]
 
-    log("Installing Android SDK components...")       
-    pkgs = [
-        "platform-tools",
-        f"build-tools;{build_tools_id}",
-        f"cmake;{cmake_id}",
-        f"ndk;{ndk_id}",
-    ]
-    pkgs += platforms_list
-    run_checked([sdkmanager, f"--sdk_root={android_sdk}", *pkgs], env=env)
+    # Fingerprint of the last successful run; lets re-runs skip sdkmanager entirely.
+    state_file = android_sdk.parent / ".bootstrap_state.json"
+    state = {
+        "platforms": platforms_id,
+        "build_tools": build_tools_id,
+        "ndk": ndk_id,
+        "cmake": cmake_id,
+        "flutter": env_map.get("FLUTTER_REF") or env_map["FLUTTER_CHANNEL"],
+    }
+    try:
+        prev_state = json.loads(state_file.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        prev_state = None
+
+    if prev_state == state and (android_sdk / "ndk" / ndk_id).exists():
+        log("All SDK components up to date.")
+    else:
+        log("Installing Android SDK components (accepting licenses)...")
+        pkgs = [
+            "platform-tools",
+            f"build-tools;{build_tools_id}",
+            f"cmake;{cmake_id}",
+            f"ndk;{ndk_id}",
+        ]
+        pkgs += platforms_list
+        # First install deliberately keeps two sdkmanager (JVM) starts: accepting every SDK license
+        # keeps `flutter doctor` clean. Re-runs with changed versions only need the licenses of the
+        # packages being installed, which the install call accepts from stdin.
+        if prev_state is None:
+            log("Accepting Android licenses...")
+            try:
+                run_checked([sdkmanager, f"--sdk_root={android_sdk}", "--licenses"], env=env, input_bytes=("y\n"*200).encode("utf-8"))
+            except Exception as e:
+                err(f"License acceptance had warnings: {e}")
+        run_checked([sdkmanager, f"--sdk_root={android_sdk}", *pkgs], env=env, input_bytes=("y\n"*500).encode("utf-8"))
 
     # Configure Flutter + precache
     fl = flutter_bin(flutter_root)
     log("Configuring Flutter and precaching artifacts...")
     run_checked([fl, "config", "--android-sdk", str(android_sdk)], env=env)
-    precache_args = ["--android"]
-    if is_windows():
+    # Only fetch engine artifacts for targets this host will build; the rest download on demand.
+    precache_args = ["--no-ios", "--no-macos", "--no-linux", "--no-fuchsia", "--no-web", "--android"]
+    if IS_WINDOWS and env_map.get("ENABLE_WINDOWS_DESKTOP", "0") == "1":
         precache_args.append("--windows")
+    else:
+        precache_args.append("--no-windows")
+    log(f"Precaching: {' '.join(precache_args)}")
     run_checked([fl, "precache", *precache_args], env=env)
 
+    state_file.write_text(json.dumps(state, indent=2), encoding="utf-8")
+
 def ensure_msvc_on_windows():
-    if not is_windows():
+    if not IS_WINDOWS:
+        return
+    # Already inside a VS Developer Prompt: no need to spawn vswhere.
+    if os.environ.get("VCINSTALLDIR") or os.environ.get("VSINSTALLDIR"):
+        log("MSVC Build Tools detected via environment.")
         return
     # Detect via vswhere if VC tools are present
     vswhere_paths = [
@@ -212,18 +427,19 @@ def ensure_msvc_on_windows():
         return
 
     log("MSVC Build Tools not found. Attempting installation via winget (requires Admin)...")
-    if not have_cmd("winget"):
-        err("winget is not available. Please install Visual Studio 2022 Build Tools manually.")
+    if not winget_available():
+        err("winget is not available or disabled (WINGET_DISABLE=1). Please install Visual Studio 2022 Build Tools manually.")
         return
 
     try:
         # Minimal C++ workload; includeRecommended adds CMake/MSBuild helpers and Windows SDK.
-        run_checked([
-            "winget","install","-e","--id","Microsoft.VisualStudio.2022.BuildTools",
-            "--override",
-            "--add Microsoft.VisualStudio.Workload.VCTools --includeRecommended --passive --norestart --wait",
-            "--accept-package-agreements","--accept-source-agreements"
-        ])
+        with _WINGET_LOCK:
+            run_checked([
+                "winget","install","-e","--id","Microsoft.VisualStudio.2022.BuildTools",
+                "--override",
+                "--add Microsoft.VisualStudio.Workload.VCTools --includeRecommended --passive --norestart --wait",
+                "--accept-package-agreements","--accept-source-agreements"
+            ])
         log("Winget install command issued. If it required elevation, re-run this script as Administrator or install manually.")
     except Exception as e:
         err(f"Winget installation failed or needs elevation. You can run this from an elevated PowerShell:\n"
@@ -247,10 +463,30 @@ def main():
     tooling.mkdir(parents=True, exist_ok=True)
 
     ensure_prereqs()
-    install_flutter(flutter_root, env_map)
-    install_android_cmdline(android_sdk, env_map)
-    install_android_packages(android_sdk, env_map, flutter_root)
-    ensure_msvc_on_windows()
+    # Flutter clone, cmdline-tools download and winget installs are independent I/O-bound steps.
+    pool = concurrent.futures.ThreadPoolExecutor(max_workers=4)
+    try:
+        msvc = pool.submit(ensure_msvc_on_windows)
+        deps = [
+            pool.submit(install_flutter, flutter_root, env_map),
+            pool.submit(install_android_cmdline, android_sdk, env_map),
+        ]
+        if not have_cmd("java"):
+            deps.append(pool.submit(install_java_winget))
+        done, _ = concurrent.futures.wait(deps, return_when=concurrent.futures.FIRST_EXCEPTION)
+        for f in done:
+            f.result()
+        ensure_java()
+        flush_logs()
+        # Needs flutter, sdkmanager and java in place.
+        install_android_packages(android_sdk, env_map, flutter_root)
+        flush_logs()
+        msvc.result()
+    except BaseException:
+        # Report failures (and Ctrl-C) right away instead of waiting for the other workers.
+        pool.shutdown(wait=False, cancel_futures=True)
+        raise
+    pool.shutdown()
 
     # Final hints
     log("\nBootstrap complete.")
@@ -258,7 +494,7 @@ def main():
     log("  - Open VS Code here (settings already configured for local SDKs).")
     log("  - Run: flutter doctor -v")
     log("  - Android: flutter pub get && flutter build apk --release")
-    if is_windows():
+    if IS_WINDOWS:
         log("  - Windows: flutter config --enable-windows-desktop && flutter build windows --release")
 
 if __name__ == "__main__":
@@ -266,3 +502,5 @@ if __name__ == "__main__":
         main()
     except KeyboardInterrupt:
         sys.exit(130)
+    finally:
+        flush_logs()